@@ -1,15 +1,173 @@
 import cv2
 import requests
+from requests.adapters import HTTPAdapter
 import numpy as np
+import multiprocessing as mp
+import os
+import signal
+from multiprocessing import resource_tracker, shared_memory
 from threading import Thread
 import time
+from turbojpeg import TurboJPEG, TJPF_BGR
+
+try:
+    import torch
+    from torchvision.io import ImageReadMode, decode_jpeg
+except ImportError:
+    torch = None
+
+# HTTP session with a small pool and retries disabled. The probe and the
+# stream reader run in different processes, so they do not share connections.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "http://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0)
+)
+
+# Upper bound on bytes taken from the socket per read
+READ_CHUNK_SIZE = 65536
+
+# Shared-memory frame ring used between the reader process and the viewer
+RING_SLOTS = 4
+
+# Key codes handled by the viewer window
+KEY_QUIT = ord("q")
+
+# Pause between key polls while waiting for the first frame
+WAITING_POLL_INTERVAL = 0.005
+
+
+def raw_read1(raw):
+    """Return raw's read1 so a finished frame is not held for a full block"""
+    read1 = getattr(raw, "read1", None)  # HTTPResponse.read1 is urllib3 >= 2.2
+    if read1 is None:
+        read1 = raw._fp.read1  # Older urllib3: the private http.client response
+    return read1
+
+
+class TurboJPEGDecoder:
+    """Decode JPEG frames on the CPU into a caller-provided BGR buffer"""
+
+    def __init__(self):
+        self._tj = TurboJPEG()
+
+    def decode(self, jpeg_data, dst=None):
+        """Decode into dst, allocating a new buffer if dst has the wrong size"""
+        width, height, _, _ = self._tj.decode_header(jpeg_data)
+        if dst is None or dst.shape[:2] != (height, width):
+            dst = np.empty((height, width, 3), dtype=np.uint8)
+        self._tj.decode(jpeg_data, pixel_format=TJPF_BGR, dst=dst)
+        return dst
+
+
+class CUDAJPEGDecoder:
+    """Decode JPEG frames on an NVIDIA GPU (nvJPEG via torchvision)"""
+
+    def __init__(self):
+        self._stream = torch.cuda.Stream()
+
+    def decode(self, jpeg_data, dst=None):
+        """Decode into dst, allocating a new buffer if dst has the wrong size"""
+        data = torch.frombuffer(jpeg_data, dtype=torch.uint8)
+        with torch.cuda.stream(self._stream):
+            rgb = decode_jpeg(data, mode=ImageReadMode.RGB, device="cuda")
+            # CHW RGB -> HWC BGR for OpenCV, still on the GPU
+            bgr = rgb.flip(0).permute(1, 2, 0)
+            if dst is None or dst.shape != tuple(bgr.shape):
+                # Pinned host memory lets the copy back run asynchronously
+                host = torch.empty(bgr.shape, dtype=torch.uint8, pin_memory=True)
+                dst = host.numpy()
+            torch.from_numpy(dst).copy_(bgr, non_blocking=True)
+        self._stream.synchronize()
+        return dst
+
+
+def create_decoder():
+    """Use the GPU decoder when CUDA is available, otherwise TurboJPEG"""
+    if torch is not None and torch.cuda.is_available():
+        try:
+            return CUDAJPEGDecoder()
+        except Exception as e:
+            print(f"CUDA JPEG decoder unavailable, using TurboJPEG: {e}")
+    return TurboJPEGDecoder()
+
+
+class MJPEGParser:
+    """Split an MJPEG byte stream into JPEG frames one read at a time
+
+    The parser looks for the JPEG SOI and EOI markers instead of the
+    multipart boundary, so a frame is complete in the read that delivers
+    its EOI rather than one frame later. Only the pieces of the frame in
+    progress are kept.
+    """
+
+    __slots__ = ("_state", "_pending", "_carry")
+
+    SEEK_SOI = 0
+    IN_JPEG = 1
+
+    def __init__(self):
+        self._state = self.SEEK_SOI
+        self._pending = []
+        # True if the previous read ended with 0xFF, the first byte of a
+        # marker that may be completed by the next read
+        self._carry = False
+
+    def feed(self, chunk):
+        """Consume one read and return the newest JPEG it completed, or None"""
+        latest = None
+        pos = 0
+        start = 0
+        while True:
+            if self._state == self.SEEK_SOI:
+                if self._carry and chunk.startswith(b"\xd8"):
+                    self._pending = [b"\xff"]
+                    start = 0
+                    pos = 1
+                else:
+                    soi = chunk.find(b"\xff\xd8", pos)
+                    if soi == -1:
+                        self._carry = chunk.endswith(b"\xff")
+                        break
+                    self._pending = []
+                    start = soi
+                    pos = soi + 2
+                self._carry = False
+                self._state = self.IN_JPEG
+                continue
+
+            if self._carry and pos == 0 and chunk.startswith(b"\xd9"):
+                end = 1
+            else:
+                eoi = chunk.find(b"\xff\xd9", pos)
+                if eoi == -1:
+                    self._pending.append(chunk[start:])
+                    self._carry = chunk.endswith(b"\xff")
+                    break
+                end = eoi + 2
+
+            # Any earlier frame finished in this read is stale, drop it
+            self._pending.append(chunk[start:end])
+            latest = self._pending
+            self._carry = False
+            self._state = self.SEEK_SOI
+            pos = end
+
+        return b"".join(latest) if latest is not None else None
 
 
 class MJPEGStream:
+    """Read and decode an MJPEG stream on a background thread
+
+    Subclasses receive each decoded frame through _publish().
+    """
+
+    # Fixed attributes avoid a __dict__ lookup on every read in the loop
+    __slots__ = ("url", "running", "thread", "_decoder")
+
     def __init__(self, url):
         self.url = url
-        self.frame = None
         self.running = False
+        self._decoder = create_decoder()
 
     def start(self):
         self.running = True
@@ -18,66 +176,72 @@ class MJPEGStream:
 
     def _read_stream(self):
         try:
-            response = requests.get(self.url, stream=True, timeout=10)
+            response = _SESSION.get(self.url, stream=True, timeout=10)
             if response.status_code != 200:
                 print(f"Failed to connect: HTTP {response.status_code}")
                 return
 
-            boundary = None
-            buffer = b""
+            # Read from the raw socket instead of the small-chunk iterator
+            raw = response.raw
+            raw.decode_content = False
 
-            for chunk in response.iter_content(chunk_size=1024):
-                if not self.running:
-                    break
+            # Bind the per-read calls to locals once for the loop below;
+            # running is still read from self so stop() is seen
+            read_chunk = raw_read1(raw)
+            feed = MJPEGParser().feed
+            decode = self._decoder.decode
+            publish = self._publish
+            dst = None
 
-                buffer += chunk
+            while self.running:
+                chunk = read_chunk(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
 
-                # Find boundary if not found yet
-                if boundary is None:
-                    if b"boundary=" in buffer:
-                        boundary_line = buffer.split(b"boundary=")[1].split(b"\r\n")[0]
-                        boundary = b"--" + boundary_line
-                        print(f"Found boundary: {boundary}")
+                # Only the newest frame completed by this read is decoded
+                jpeg_data = feed(chunk)
+                if jpeg_data is None:
                     continue
 
-                # Look for complete frames
-                while boundary in buffer:
-                    # Find the start and end of a frame
-                    start = buffer.find(boundary)
-                    if start == -1:
-                        break
-
-                    next_boundary = buffer.find(boundary, start + len(boundary))
-                    if next_boundary == -1:
-                        break
-
-                    # Extract frame data
-                    frame_data = buffer[start:next_boundary]
-
-                    # Find the start of JPEG data (after headers)
-                    jpeg_start = frame_data.find(b"\xff\xd8")  # JPEG header
-                    if jpeg_start != -1:
-                        jpeg_data = frame_data[jpeg_start:]
-
-                        # Decode JPEG
-                        try:
-                            frame_array = np.frombuffer(jpeg_data, dtype=np.uint8)
-                            frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
-                            if frame is not None:
-                                self.frame = frame
-                        except Exception as e:
-                            print(f"Error decoding frame: {e}")
+                try:
+                    dst = decode(jpeg_data, dst)
+                except Exception as e:
+                    dst = self._fall_back_to_cpu(jpeg_data, e)
+                    if dst is None:
+                        print(f"Error decoding frame: {e}")
+                        continue
+                    decode = self._decoder.decode
 
-                    # Remove processed data from buffer
-                    buffer = buffer[next_boundary:]
+                try:
+                    publish(dst)
+                except Exception as e:
+                    print(f"Error publishing frame: {e}")
 
         except Exception as e:
             print(f"Stream error: {e}")
         finally:
             self.running = False
 
-    def read(self):
-        return self.frame is not None, self.frame
+    def _fall_back_to_cpu(self, jpeg_data, error):
+        """Switch to TurboJPEG if it can decode a frame the GPU decoder failed on
+
+        Returns the decoded frame after switching, or None if the frame is
+        bad or the CPU decoder was already in use.
+        """
+        if not isinstance(self._decoder, CUDAJPEGDecoder):
+            return None
+        decoder = TurboJPEGDecoder()
+        try:
+            frame = decoder.decode(jpeg_data)
+        except Exception:
+            return None  # A corrupt frame, not a GPU decoder problem
+        print(f"CUDA JPEG decode failed, using TurboJPEG: {error}")
+        self._decoder = decoder
+        return frame
+
+    def _publish(self, frame):
+        """Hand over a decoded frame; the buffer is reused by the next decode"""
+        raise NotImplementedError
 
     def stop(self):
         self.running = False
@@ -85,6 +249,231 @@ class MJPEGStream:
             self.thread.join()
 
 
+class SharedFrameRing:
+    """Ring of frame slots in shared memory for one writer and one reader
+
+    The writer fills slot head % slots and then advances head, so the
+    reader can always take the slot at head - 1 without locking. Once
+    done with that frame, the reader checks with intact() that the writer
+    has not come back around to the slot in the meantime. head and
+    the per-slot frame sizes live in a header at the start of the block,
+    so the ring can be attached from its name alone.
+    """
+
+    def __init__(self, shm, slots, slot_size):
+        self.shm = shm
+        self.slots = slots
+        self.slot_size = slot_size
+        # [head, height0, width0, height1, width1, ...]
+        self._header = np.ndarray((1 + slots * 2,), dtype=np.int64, buffer=shm.buf)
+        self._data_offset = self._header_size(slots)
+
+    @staticmethod
+    def _header_size(slots):
+        # Keep the frame data cache-line aligned
+        return -(-(1 + slots * 2) * 8 // 64) * 64
+
+    @classmethod
+    def create(cls, frame_shape, slots=RING_SLOTS):
+        """Allocate a ring whose slots hold frames of frame_shape"""
+        slot_size = int(np.prod(frame_shape))
+        shm = shared_memory.SharedMemory(
+            create=True, size=cls._header_size(slots) + slots * slot_size
+        )
+        return cls(shm, slots, slot_size)
+
+    @classmethod
+    def attach(cls, name, slots, slot_size):
+        return cls(shared_memory.SharedMemory(name=name), slots, slot_size)
+
+    def describe(self):
+        """Return the (name, slots, slot_size) needed to attach to this ring"""
+        return self.shm.name, self.slots, self.slot_size
+
+    def _slot_view(self, slot, height, width):
+        return np.ndarray(
+            (height, width, 3),
+            dtype=np.uint8,
+            buffer=self.shm.buf,
+            offset=self._data_offset + slot * self.slot_size,
+        )
+
+    def write(self, frame):
+        height, width = frame.shape[:2]
+        if frame.nbytes > self.slot_size:
+            raise ValueError(f"Frame {width}x{height} does not fit in a ring slot")
+
+        header = self._header
+        head = int(header[0])
+        slot = head % self.slots
+        np.copyto(self._slot_view(slot, height, width), frame)
+        header[1 + slot * 2] = height
+        header[2 + slot * 2] = width
+        header[0] = head + 1
+
+    def latest(self):
+        """Return (head, frame) for the most recently written slot"""
+        header = self._header
+        head = int(header[0])
+        if head == 0:
+            return head, None
+        slot = (head - 1) % self.slots
+        height, width = int(header[1 + slot * 2]), int(header[2 + slot * 2])
+        return head, self._slot_view(slot, height, width)
+
+    def intact(self, head):
+        """Return True if the frame latest() returned with head is unchanged"""
+        # The slot at head - 1 is rewritten once head reaches head - 1 + slots
+        return int(self._header[0]) - head < self.slots - 1
+
+    def close(self):
+        # The header view must go before the mapping can be closed
+        self._header = None
+        self.shm.close()
+
+    def untrack(self):
+        """Keep this process's resource tracker from unlinking the ring at exit"""
+        if os.name == "posix":
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+
+    def unlink(self):
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass  # Already gone, e.g. removed externally
+
+
+class _RingWriterStream(MJPEGStream):
+    """MJPEGStream that publishes decoded frames into a SharedFrameRing
+
+    The ring is sized from the first decoded frame. If a later frame does
+    not fit, a new ring is created. Each new ring is announced to the
+    viewer process over conn.
+    """
+
+    __slots__ = ("_conn", "_ring")
+
+    def __init__(self, url, conn):
+        super().__init__(url)
+        self._conn = conn
+        self._ring = None
+
+    def _publish(self, frame):
+        ring = self._ring
+        if ring is None or frame.nbytes > ring.slot_size:
+            self._ring = SharedFrameRing.create(frame.shape)
+            # The viewer owns and unlinks the ring, not this process
+            self._ring.untrack()
+            self._conn.send(self._ring.describe())
+            if ring is not None:
+                ring.close()
+        self._ring.write(frame)
+
+    def close_ring(self):
+        if self._ring is not None:
+            self._ring.close()
+
+
+def _run_ring_reader(url, conn, stop_event):
+    # Ctrl-C reaches this process too; the viewer stops it via stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    stream = _RingWriterStream(url, conn)
+    stream.start()
+    try:
+        while stream.running and not stop_event.wait(0.1):
+            pass
+    finally:
+        stream.stop()
+        stream.close_ring()
+
+
+class SharedMemoryStream:
+    """Read the MJPEG stream in a separate process and share frames via a ring
+
+    Decoding then runs outside this process, so it is not serialized with
+    the GUI loop by the GIL. The reader process creates the ring once it
+    knows the frame size. This process attaches to it and unlinks it on
+    stop(). Frames returned by read() are views into shared memory and
+    stay valid until stop() is called.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self._read_seq = 0
+        self._ring = None
+        # Rings replaced after a frame size change, unmapped on stop()
+        self._retired = []
+
+    def start(self):
+        self._conn, child_conn = mp.Pipe(duplex=False)
+        self._stop_event = mp.Event()
+        self.process = mp.Process(
+            target=_run_ring_reader,
+            args=(self.url, child_conn, self._stop_event),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def _attach_new_rings(self):
+        while self._conn.poll():
+            try:
+                description = self._conn.recv()
+            except EOFError:
+                break  # The reader process has exited
+            try:
+                ring = SharedFrameRing.attach(*description)
+            except FileNotFoundError:
+                continue  # Removed before we got to it, keep the current ring
+            if self._ring is not None:
+                # Views of the old ring may still be in use, so only unlink
+                self._ring.unlink()
+                self._retired.append(self._ring)
+            self._ring = ring
+            self._read_seq = 0
+
+    def read(self):
+        """Return (new, frame); new is True if a frame arrived since the last read"""
+        self._attach_new_rings()
+        if self._ring is None:
+            return False, None
+        seq, frame = self._ring.latest()
+        new = seq != self._read_seq
+        self._read_seq = seq
+        return new, frame
+
+    def verify(self):
+        """Return True if the frame from the last read() was not overwritten
+
+        Call this once the frame has been used. If it was overwritten, the
+        next read() reports its frame as new so it is shown again.
+        """
+        if self._ring is None or self._ring.intact(self._read_seq):
+            return True
+        self._read_seq = -1
+        return False
+
+    def stop(self):
+        if not hasattr(self, "process"):
+            return
+        self._stop_event.set()
+        self.process.join(timeout=15)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+        # Pick up rings announced since the last read so none are leaked
+        self._attach_new_rings()
+        for ring in self._retired:
+            ring.close()
+        self._retired = []
+        if self._ring is not None:
+            self._ring.close()
+            self._ring.unlink()
+            self._ring = None
+
+
 def main():
     STREAM_URL = "http://192.168.178.71:8080/stream"
 
@@ -92,48 +481,65 @@ def main():
 
     # Test basic connectivity first
     try:
-        response = requests.get(STREAM_URL, timeout=5, stream=True)
+        response = _SESSION.get(STREAM_URL, timeout=5, stream=True)
         print(f"HTTP Response: {response.status_code}")
         print(f"Content-Type: {response.headers.get('content-type', 'Unknown')}")
+        response.close()
     except Exception as e:
         print(f"Connection test failed: {e}")
         return
 
-    # Create and start MJPEG stream
-    stream = MJPEGStream(STREAM_URL)
+    # Render the waiting message once, it is shown until the first frame
+    waiting_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    cv2.putText(
+        waiting_frame,
+        "Waiting for stream...",
+        (50, 240),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        1,
+        (255, 255, 255),
+        2,
+    )
+
+    # Create and start MJPEG stream in its own reader process
+    stream = SharedMemoryStream(STREAM_URL)
     stream.start()
 
     print("Stream started. Press 'q' to quit.")
 
-    # Wait a moment for first frame
-    time.sleep(2)
-
-    while True:
-        ret, frame = stream.read()
-
-        if ret and frame is not None:
-            cv2.imshow("iPhone Camera Stream", frame)
-        else:
-            # Show a waiting message
-            waiting_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-            cv2.putText(
-                waiting_frame,
-                "Waiting for stream...",
-                (50, 240),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1,
-                (255, 255, 255),
-                2,
-            )
-            cv2.imshow("iPhone Camera Stream", waiting_frame)
-
-        # Break the loop on 'q' key press
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
-
-    # Clean up
-    stream.stop()
-    cv2.destroyAllWindows()
+    try:
+        # Wait a moment for first frame
+        time.sleep(2)
+
+        # Show the waiting message once until the first frame replaces it
+        cv2.imshow("iPhone Camera Stream", waiting_frame)
+
+        while True:
+            new, frame = stream.read()
+
+            if frame is not None:
+                # Only hand a frame to HighGUI when the reader produced a new one,
+                # but keep pumping window events every pass
+                if new:
+                    cv2.imshow("iPhone Camera Stream", frame)
+                    # imshow has copied the pixels; redraw next pass if the
+                    # reader overwrote the slot while it was being copied
+                    stream.verify()
+                key = cv2.waitKey(1) & 0xFF
+            else:
+                # Poll keys without blocking while waiting for the stream
+                key = cv2.pollKey() & 0xFF
+                time.sleep(WAITING_POLL_INTERVAL)
+
+            # Break the loop on 'q' key press
+            if key == KEY_QUIT:
+                break
+    finally:
+        # Clean up even on Ctrl-C or an error, so the reader process is
+        # joined and the shared memory is unlinked (drop the view first)
+        frame = None
+        stream.stop()
+        cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,20 @@
+import asyncio
+import errno
+import os
 import cv2
 import socket
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Network discovery probe settings
+DISCOVER_REQUEST = b"GET /discover HTTP/1.0\r\nHost: camera\r\n\r\n"
+CHECK_TIMEOUT = 1
+PROBE_CONNECT_TIMEOUT = 0.3
+PROBE_READ_TIMEOUT = 1
+MAX_CONCURRENT_PROBES = 200
+
+# Low-latency FFmpeg input for the camera stream opened in main()
+os.environ.setdefault(
+    "OPENCV_FFMPEG_CAPTURE_OPTIONS", "fflags;nobuffer|flags;low_delay"
+)
 
 
 def get_local_network_range():
@@ -21,21 +34,69 @@ def get_local_network_range():
         return "192.168.1", "192.168.1.100"
 
 
+def parse_discover_response(ip, data):
+    """Return ip if data is a successful /discover response"""
+    status_line, _, rest = data.partition(b"\r\n")
+    if status_line.split()[1:2] != [b"200"]:
+        return None
+
+    body = rest.partition(b"\r\n\r\n")[2].decode(errors="replace")
+    print(f"✓ Found server at {ip}: {body}")
+    return ip
+
+
 def check_camera_server(ip):
     """Check if there's a camera server at the given IP"""
     try:
-        response = requests.get(f"http://{ip}:8080/discover", timeout=1)
-        if response.status_code == 200:
-            print(f"✓ Found server at {ip}: {response.text}")
-            return ip
-    except requests.exceptions.ConnectTimeout:
-        pass  # Expected for most IPs
-    except requests.exceptions.ConnectionError:
-        pass  # Expected for most IPs
-    except Exception as e:
-        # Only print unexpected errors
-        if "Connection refused" not in str(e) and "timeout" not in str(e).lower():
+        with socket.create_connection((ip, 8080), timeout=CHECK_TIMEOUT) as s:
+            s.sendall(DISCOVER_REQUEST)
+            data = s.recv(512)
+    except (ConnectionError, socket.timeout):
+        return None  # Expected for most IPs
+    except OSError as e:
+        # No route to the IP is also expected when nothing is there
+        if e.errno not in (errno.EHOSTUNREACH, errno.ENETUNREACH):
             print(f"Unexpected error checking {ip}: {e}")
+        return None
+    return parse_discover_response(ip, data)
+
+
+async def probe_camera_server(ip, semaphore):
+    """Probe a single IP for the camera server's /discover endpoint"""
+    async with semaphore:
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(ip, 8080), timeout=PROBE_CONNECT_TIMEOUT
+            )
+        except (OSError, asyncio.TimeoutError):
+            return None  # Expected for most IPs
+
+        try:
+            writer.write(DISCOVER_REQUEST)
+            await writer.drain()
+            data = await asyncio.wait_for(reader.read(512), timeout=PROBE_READ_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            writer.close()
+
+    return parse_discover_response(ip, data)
+
+
+async def scan_for_camera_server(ips):
+    """Probe all IPs concurrently and return the first camera server found"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
+    tasks = [asyncio.create_task(probe_camera_server(ip, semaphore)) for ip in ips]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if result:
+                return result
+    finally:
+        # Stop the remaining probes once a server has been found
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
     return None
 
 
@@ -64,15 +125,11 @@ def discover_camera_server():
 
     print(f"Checking {len(ips_to_check)} IP addresses...")
 
-    # Use threading to check multiple IPs concurrently
-    with ThreadPoolExecutor(max_workers=50) as executor:
-        futures = {executor.submit(check_camera_server, ip): ip for ip in ips_to_check}
-
-        for future in as_completed(futures):
-            result = future.result()
-            if result:
-                print(f"Found camera server at: {result}")
-                return result
+    # Probe all IPs concurrently from a single event loop
+    result = asyncio.run(scan_for_camera_server(ips_to_check))
+    if result:
+        print(f"Found camera server at: {result}")
+        return result
 
     print("No camera server found on the network")
     return None
@@ -104,8 +161,12 @@ def main():
     stream_url = f"http://{server_ip}:8080/stream"
     print(f"Connecting to camera stream at: {stream_url}")
 
-    # Create a VideoCapture object
-    cap = cv2.VideoCapture(stream_url)
+    # Create a VideoCapture object on the FFmpeg backend
+    cap = cv2.VideoCapture(
+        stream_url,
+        cv2.CAP_FFMPEG,
+        [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+    )
 
     if not cap.isOpened():
         print("Error: Could not open video stream")
@@ -1,10 +1,34 @@
 import cv2
 import requests
+from requests.adapters import HTTPAdapter
 import numpy as np
+from turbojpeg import TurboJPEG, TJPF_BGR
 
 # Direct IP address of the iPhone camera server
 STREAM_URL = "http://192.168.178.71:8080/stream"
 
+# Upper bound on bytes taken from the socket per read
+READ_CHUNK_SIZE = 65536
+
+# Key codes handled by the viewer window
+KEY_QUIT = ord("q")
+KEY_FULLSCREEN = ord("f")
+KEY_ESC = 27
+
+# HTTP session with a small pool and retries disabled for the stream request
+_SESSION = requests.Session()
+_SESSION.mount(
+    "http://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0)
+)
+
+
+def raw_read1(raw):
+    """Return a read(n) on raw that gives back what has arrived, up to n"""
+    read1 = getattr(raw, "read1", None)  # HTTPResponse.read1 is urllib3 >= 2.2
+    if read1 is None:
+        read1 = raw._fp.read1  # Older urllib3: the private http.client response
+    return read1
+
 
 def read_mjpeg_stream():
     """Read MJPEG stream using requests library with Safari-like headers"""
@@ -19,29 +43,56 @@ def read_mjpeg_stream():
 
     try:
         print("Attempting to connect with Safari-like headers...")
-        response = requests.get(STREAM_URL, stream=True, timeout=10, headers=headers)
+        response = _SESSION.get(
+            STREAM_URL, stream=True, timeout=10, headers=headers
+        )
         response.raise_for_status()
         print("Successfully connected to stream!")
 
-        bytes_data = b""
-        for chunk in response.iter_content(chunk_size=1024):
-            bytes_data += chunk
-
-            # Look for JPEG frame boundaries
-            a = bytes_data.find(b"\xff\xd8")  # JPEG start
-            b = bytes_data.find(b"\xff\xd9")  # JPEG end
-
-            if a != -1 and b != -1:
-                # Extract the JPEG frame
-                jpg = bytes_data[a : b + 2]
-                bytes_data = bytes_data[b + 2 :]
-
-                # Decode the JPEG frame
-                frame = cv2.imdecode(
-                    np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR
-                )
-                if frame is not None:
-                    yield frame
+        tj = TurboJPEG()
+        dst = None
+        bytes_data = bytearray()
+        end_search = 0  # Where to resume looking for the JPEG end marker
+        raw = response.raw
+        raw.decode_content = False
+        read_chunk = raw_read1(raw)
+        while True:
+            chunk = read_chunk(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            bytes_data.extend(chunk)
+
+            # A large read can hold several frames, so drain them all
+            while True:
+                # Look for JPEG frame boundaries
+                a = bytes_data.find(b"\xff\xd8")  # JPEG start
+                if a == -1:
+                    break
+
+                # Don't rescan the part of the frame checked on earlier reads
+                b = bytes_data.find(b"\xff\xd9", max(a + 2, end_search))  # JPEG end
+                if b == -1:
+                    end_search = max(a + 2, len(bytes_data) - 1)
+                    break
+                end_search = 0
+
+                # View the JPEG frame in place instead of slicing a copy
+                jpg = memoryview(bytes_data)[a : b + 2]
+
+                # Decode the JPEG frame into a reused buffer
+                try:
+                    width, height, _, _ = tj.decode_header(jpg)
+                    if dst is None or dst.shape[:2] != (height, width):
+                        dst = np.empty((height, width, 3), dtype=np.uint8)
+                    tj.decode(jpg, pixel_format=TJPF_BGR, dst=dst)
+                except Exception as e:
+                    print(f"Error decoding frame: {e}")
+                    continue
+                finally:
+                    # Release the view so the consumed bytes can be dropped
+                    jpg.release()
+                    del bytes_data[: b + 2]
+                yield dst
 
     except Exception as e:
         print(f"Error reading stream: {e}")
@@ -70,9 +121,9 @@ def main():
             # Handle key presses
             key = cv2.waitKey(1) & 0xFF
 
-            if key == ord("q"):  # Quit
+            if key == KEY_QUIT:  # Quit
                 break
-            elif key == ord("f"):  # Toggle fullscreen
+            elif key == KEY_FULLSCREEN:  # Toggle fullscreen
                 if fullscreen:
                     cv2.setWindowProperty(
                         window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL
@@ -83,7 +134,7 @@ def main():
                         window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN
                     )
                     fullscreen = True
-            elif key == 27:  # ESC key - exit fullscreen
+            elif key == KEY_ESC:  # ESC key - exit fullscreen
                 if fullscreen:
                     cv2.setWindowProperty(
                         window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL
@@ -1,14 +1,24 @@
+import os
 import cv2
 
 # Replace with your iPhone's IP address from Personal Hotspot
 STREAM_URL = "http://10.171.9.250:8080/stream"  # Updated with actual hotspot IP
 
+# Don't let FFmpeg buffer the hotspot stream before handing over frames
+os.environ.setdefault(
+    "OPENCV_FFMPEG_CAPTURE_OPTIONS", "fflags;nobuffer|flags;low_delay"
+)
+
 
 def main():
     print(f"Connecting to camera stream at: {STREAM_URL}")
 
-    # Create a VideoCapture object
-    cap = cv2.VideoCapture(STREAM_URL)
+    # Create a VideoCapture object on the FFmpeg backend
+    cap = cv2.VideoCapture(
+        STREAM_URL,
+        cv2.CAP_FFMPEG,
+        [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+    )
 
     if not cap.isOpened():
         print("Error: Could not open video stream")